@@ -1,6 +1,9 @@
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Optional, Union
 import numpy as np
+import asyncio
+import os
+import torch
 
 
 class HuggingFaceEmbeddingModel:
@@ -9,11 +12,33 @@ class HuggingFaceEmbeddingModel:
     Provides the same interface as the OpenAI EmbeddingModel for compatibility.
     """
 
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        batch_size: int = 32,
+        num_threads: Optional[int] = None,
+        show_progress_bar: bool = False,
+        backend: str = "torch",
+        model_file_name: Optional[str] = None,
+        quantize: bool = False,
+        batch_timeout_ms: float = 10,
+    ):
         """
         Initialize the HuggingFace embedding model.
 
         :param model_name: Name of the sentence-transformers model to use
+        :param batch_size: Number of texts per forward pass in get_embeddings
+        :param num_threads: CPU threads for the torch backend (defaults to all available cores)
+        :param show_progress_bar: Whether get_embeddings shows a progress bar
+        :param backend: Inference backend - "torch", "onnx" (ONNX Runtime) or "openvino".
+            The exported backends are typically 2-3x faster on CPU.
+        :param model_file_name: Specific exported model file to load for the onnx/openvino
+            backends, e.g. "onnx/model_qint8_avx512.onnx"
+        :param quantize: Apply dynamic int8 quantization to the Linear layers (torch
+            backend only, runs on CPU). Roughly doubles CPU throughput for a small loss
+            in accuracy.
+        :param batch_timeout_ms: How long async_get_embedding waits for other concurrent
+            requests to share a forward pass with
 
         Popular models:
         - sentence-transformers/all-MiniLM-L6-v2 (384 dim) - Fast and efficient
@@ -21,10 +46,40 @@ class HuggingFaceEmbeddingModel:
         - sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2 (384 dim) - Multilingual
         """
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.batch_size = batch_size
+        self.show_progress_bar = show_progress_bar
+        self.batch_timeout_ms = batch_timeout_ms
+        self._pending = []  # (text, future) pairs waiting for the next batch
+        self._flush_handle = None
+        self._batch_loop = None  # Event loop that owns _pending and _flush_handle
+        self._batch_tasks = set()
+        if backend not in ("torch", "onnx", "openvino"):
+            raise ValueError(f"Unsupported backend: {backend}. Use 'torch', 'onnx' or 'openvino'.")
+        if quantize and backend != "torch":
+            raise ValueError("quantize=True is only supported with the torch backend")
+        self.backend = backend
+        if backend == "torch":
+            # Process-wide setting, so only applied once the arguments are valid
+            torch.set_num_threads(num_threads or os.cpu_count())
+        # Only pass the backend options when used: sentence-transformers < 3.2
+        # doesn't accept the backend keyword at all
+        model_options = {}
+        if backend != "torch" or model_file_name:
+            model_options["backend"] = backend
+        if model_file_name:
+            model_options["model_kwargs"] = {"file_name": model_file_name}
+        if quantize:
+            # Dynamically quantized Linear layers only have CPU kernels, so don't
+            # let sentence-transformers place the model on an available GPU
+            model_options["device"] = "cpu"
+        self.model = SentenceTransformer(model_name, **model_options)
+        if quantize:
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
         self.embedding_dimension = self.model.get_sentence_embedding_dimension()
 
-        print(f"Loaded {model_name}")
+        print(f"Loaded {model_name} ({backend} backend)")
         print(f"Max sequence length: {self.model.max_seq_length}")
         print(f"Embedding dimension: {self.embedding_dimension}")
 
@@ -33,47 +88,128 @@ class HuggingFaceEmbeddingModel:
         Get embedding for a single text.
 
         :param text: Text to embed
-        :return: Embedding as a list of floats
+        :return: L2-normalized embedding as a list of floats
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
+        embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
         return embedding.tolist()
 
-    def get_embeddings(self, list_of_text: List[str]) -> List[List[float]]:
+    def get_embeddings(
+        self, list_of_text: List[str], as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         """
         Get embeddings for a list of texts (batch processing).
 
+        The whole list goes to a single encode call: sentence-transformers
+        sorts it by length before batching, so each batch is padded only to
+        texts of similar length, and restores the input order afterwards.
+
         :param list_of_text: List of texts to embed
-        :return: List of embeddings
+        :param as_numpy: Return the (N, D) array from the model as-is instead of
+            converting every value to a Python float
+        :return: List of L2-normalized embeddings
         """
-        embeddings = self.model.encode(list_of_text, convert_to_numpy=True, show_progress_bar=True)
-        return [embedding.tolist() for embedding in embeddings]
+        embeddings = self.model.encode(
+            list_of_text,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=self.show_progress_bar,
+        )
+        if as_numpy:
+            # Some backends (e.g. fp16 ONNX exports) return other dtypes; hand
+            # callers C-contiguous float32 rows (a no-op when already so)
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
+        return embeddings.tolist()
 
     async def async_get_embedding(self, text: str) -> List[float]:
         """
-        Async version of get_embedding for compatibility.
-        Note: sentence-transformers doesn't have native async support,
-        so this just calls the sync version.
+        Async version of get_embedding.
+        Concurrent calls are coalesced: requests arriving within batch_timeout_ms
+        of each other (up to batch_size) share a single forward pass, which runs
+        in a worker thread so the event loop is not blocked.
 
         :param text: Text to embed
-        :return: Embedding as a list of floats
+        :return: L2-normalized embedding as a list of floats
         """
-        return self.get_embedding(text)
-
-    async def async_get_embeddings(self, list_of_text: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._batch_loop:
+            self._reset_batching(loop)
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_timeout_ms / 1000, self._flush_pending)
+        return await future
+
+    def _reset_batching(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Hand the batch queue to a new event loop (e.g. a later asyncio.run call).
+        A timer or futures left by the previous loop would never fire on this one.
+        """
+        old_loop, pending = self._batch_loop, self._pending
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if old_loop is not None and not old_loop.is_closed():
+            # Don't leave callers on a still-running loop waiting forever
+            for _, future in pending:
+                if not future.done():
+                    old_loop.call_soon_threadsafe(future.cancel)
+        self._pending = []
+        self._flush_handle = None
+        self._batch_tasks = set()
+        self._batch_loop = loop
+
+    def _flush_pending(self) -> None:
+        """Send all queued async_get_embedding requests to the model as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # Skip requests whose callers already gave up (cancelled or timed out)
+        pending = [(text, future) for text, future in self._pending if not future.done()]
+        self._pending = []
+        if pending:
+            task = asyncio.ensure_future(self._encode_pending(pending))
+            # Keep a reference so the task isn't garbage collected mid-flight
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _encode_pending(self, pending: list) -> None:
+        texts = [text for text, _ in pending]
+        try:
+            embeddings = await asyncio.to_thread(
+                self.model.encode,
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), embedding in zip(pending, embeddings):
+            if not future.done():
+                future.set_result(embedding.tolist())
+
+    async def async_get_embeddings(
+        self, list_of_text: List[str], as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         """
         Async version of get_embeddings for compatibility.
         Note: sentence-transformers doesn't have native async support,
         so this just calls the sync version.
 
         :param list_of_text: List of texts to embed
-        :return: List of embeddings
+        :param as_numpy: Return an (N, D) array instead of nested lists
+        :return: List of L2-normalized embeddings
         """
-        return self.get_embeddings(list_of_text)
+        return self.get_embeddings(list_of_text, as_numpy=as_numpy)
 
 
 if __name__ == "__main__":
-    import asyncio
-
     # Test the embedding model
     embedding_model = HuggingFaceEmbeddingModel()
 
@@ -0,0 +1,19 @@
+"""
+Numba-compiled scoring kernels for VectorDatabase(kernel="numba").
+
+Kept in their own module so numba is only imported when this kernel is used.
+"""
+import numba
+import numpy as np
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def matrix_dot(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Row-parallel matrix-vector dot product, compiled on first use."""
+    out = np.empty(matrix.shape[0], dtype=np.float32)
+    for i in numba.prange(matrix.shape[0]):
+        total = 0.0
+        for j in range(matrix.shape[1]):
+            total += matrix[i, j] * query[j]
+        out[i] = total
+    return out
@@ -1,7 +1,8 @@
 from dotenv import load_dotenv
 from openai import AsyncOpenAI, OpenAI
 import openai
-from typing import List
+from typing import List, Union
+import numpy as np
 import os
 import asyncio
 
@@ -20,7 +21,9 @@ class EmbeddingModel:
         self.embeddings_model_name = embeddings_model_name
         self.batch_size = batch_size
 
-    async def async_get_embeddings(self, list_of_text: List[str]) -> List[List[float]]:
+    async def async_get_embeddings(
+        self, list_of_text: List[str], as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         batches = [list_of_text[i:i + self.batch_size] for i in range(0, len(list_of_text), self.batch_size)]
         
         async def process_batch(batch):
@@ -33,7 +36,10 @@ class EmbeddingModel:
         results = await asyncio.gather(*[process_batch(batch) for batch in batches])
         
         # Flatten the results
-        return [embedding for batch_result in results for embedding in batch_result]
+        embeddings = [embedding for batch_result in results for embedding in batch_result]
+        if as_numpy:
+            return np.asarray(embeddings, dtype=np.float32)
+        return embeddings
 
     async def async_get_embedding(self, text: str) -> List[float]:
         embedding = await self.async_client.embeddings.create(
@@ -42,12 +48,17 @@ class EmbeddingModel:
 
         return embedding.data[0].embedding
 
-    def get_embeddings(self, list_of_text: List[str]) -> List[List[float]]:
+    def get_embeddings(
+        self, list_of_text: List[str], as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         embedding_response = self.client.embeddings.create(
             input=list_of_text, model=self.embeddings_model_name
         )
 
-        return [embeddings.embedding for embeddings in embedding_response.data]
+        embeddings = [embeddings.embedding for embeddings in embedding_response.data]
+        if as_numpy:
+            return np.asarray(embeddings, dtype=np.float32)
+        return embeddings
 
     def get_embedding(self, text: str) -> List[float]:
         embedding = self.client.embeddings.create(
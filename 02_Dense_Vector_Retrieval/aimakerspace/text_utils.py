@@ -1,9 +1,25 @@
+import codecs
+import mmap
 import os
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import pymupdf
 
 
+def _extract_pdf(path: str) -> Tuple[str, Dict]:
+    """Extract the text and metadata of a single PDF (runs in worker processes)."""
+    with pymupdf.open(path) as doc:
+        text = "".join(page.get_text() for page in doc)
+        metadata = {
+            "source": os.path.basename(path),
+            "path": path,
+            "num_pages": len(doc)
+        }
+    return text, metadata
+
+
 class PDFFileLoader:
     def __init__(self, path: str):
         self.documents = []
@@ -21,37 +37,28 @@ class PDFFileLoader:
             )
 
     def load_file(self):
-        doc = pymupdf.open(self.path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
+        text, metadata = _extract_pdf(self.path)
         self.documents.append(text)
-
-        # Track metadata
-        filename = os.path.basename(self.path)
-        self.metadata.append({
-            "source": filename,
-            "path": self.path,
-            "num_pages": len(doc)
-        })
+        self.metadata.append(metadata)
 
     def load_directory(self):
-        for root, _, files in os.walk(self.path):
-            for file in sorted(files):  # Sort for consistent ordering
-                if file.endswith(".pdf"):
-                    filepath = os.path.join(root, file)
-                    doc = pymupdf.open(filepath)
-                    text = ""
-                    for page in doc:
-                        text += page.get_text()
-                    self.documents.append(text)
-
-                    # Track metadata
-                    self.metadata.append({
-                        "source": file,
-                        "path": filepath,
-                        "num_pages": len(doc)
-                    })
+        paths = [
+            os.path.join(root, file)
+            for root, _, files in os.walk(self.path)
+            for file in sorted(files)  # Sort for consistent ordering
+            if file.endswith(".pdf")
+        ]
+        if len(paths) <= 1:
+            results = map(_extract_pdf, paths)
+        else:
+            # Text extraction is CPU-bound, so spread files across processes;
+            # map() keeps results in the same order as paths.
+            with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+                results = list(executor.map(_extract_pdf, paths))
+
+        for text, metadata in results:
+            self.documents.append(text)
+            self.metadata.append(metadata)
 
     def load_documents(self):
         self.load()
@@ -63,11 +70,44 @@ class PDFFileLoader:
         return list(zip(self.documents, self.metadata))
 
 
+class MappedTextFile:
+    """
+    A UTF-8 text file that is memory-mapped only while it is being read.
+
+    Mapping lazily means loading a directory doesn't keep one open file
+    descriptor per document.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextmanager
+    def open(self) -> Iterator[Union[mmap.mmap, bytes]]:
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""  # Empty files cannot be mapped
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+
 class TextFileLoader:
-    def __init__(self, path: str, encoding: str = "utf-8"):
+    def __init__(self, path: str, encoding: str = "utf-8", use_mmap: bool = False):
+        """
+        :param use_mmap: Memory-map files instead of reading them into strings.
+            Documents are then MappedTextFile handles that CharacterTextSplitter
+            maps, chunks and unmaps one at a time, so the OS pages text in on
+            demand and no file is ever held in memory as a whole. Note that
+            chunk_size and chunk_overlap then count UTF-8 bytes rather than
+            characters, so non-ASCII text yields shorter chunks than with
+            use_mmap=False.
+        """
+        if use_mmap and codecs.lookup(encoding).name != "utf-8":
+            raise ValueError("use_mmap=True requires utf-8 encoded files")
         self.documents = []
         self.path = path
         self.encoding = encoding
+        self.use_mmap = use_mmap
 
     def load(self):
         if os.path.isdir(self.path):
@@ -79,18 +119,20 @@ class TextFileLoader:
                 "Provided path is neither a valid directory nor a .txt file."
             )
 
+    def _read(self, path: str) -> Union[str, MappedTextFile]:
+        if self.use_mmap:
+            return MappedTextFile(path)
+        with open(path, "r", encoding=self.encoding) as f:
+            return f.read()
+
     def load_file(self):
-        with open(self.path, "r", encoding=self.encoding) as f:
-            self.documents.append(f.read())
+        self.documents.append(self._read(self.path))
 
     def load_directory(self):
         for root, _, files in os.walk(self.path):
             for file in files:
                 if file.endswith(".txt"):
-                    with open(
-                        os.path.join(root, file), "r", encoding=self.encoding
-                    ) as f:
-                        self.documents.append(f.read())
+                    self.documents.append(self._read(os.path.join(root, file)))
 
     def load_documents(self):
         self.load()
@@ -110,11 +152,58 @@ class CharacterTextSplitter:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
 
-    def split(self, text: str) -> List[str]:
-        chunks = []
-        for i in range(0, len(text), self.chunk_size - self.chunk_overlap):
-            chunks.append(text[i : i + self.chunk_size])
-        return chunks
+    def iter_split(self, text: Union[str, bytes, mmap.mmap, MappedTextFile]) -> Iterator[str]:
+        """
+        Lazily yield chunks so callers can stream them without holding them all.
+        Accepts the same inputs as split.
+        """
+        if isinstance(text, MappedTextFile):
+            with text.open() as buffer:
+                yield from self._iter_split_buffer(buffer)
+            return
+        if not isinstance(text, str):
+            yield from self._iter_split_buffer(text)
+            return
+        chunk_size = self.chunk_size
+        for i in range(0, len(text), chunk_size - self.chunk_overlap):
+            yield text[i : i + chunk_size]
+
+    def _iter_split_buffer(self, buffer) -> Iterator[str]:
+        """
+        Split a UTF-8 buffer (bytes, mmap, ...), decoding one chunk at a time.
+
+        Sizes are measured in bytes here. Chunk edges are moved forward to the
+        next character boundary so multi-byte characters are never cut.
+        """
+        # Release the view when done, otherwise the mmap can't be closed
+        with memoryview(buffer) as view:
+            n = len(view)
+
+            def boundary(i: int) -> int:
+                while i < n and view[i] & 0xC0 == 0x80:  # UTF-8 continuation byte
+                    i += 1
+                return i
+
+            chunk_size = self.chunk_size
+            for i in range(0, n, chunk_size - self.chunk_overlap):
+                start = boundary(i)
+                end = boundary(min(i + chunk_size, n))
+                if start < end:
+                    yield str(view[start:end], "utf-8")
+
+    def split(self, text: Union[str, bytes, mmap.mmap, MappedTextFile]) -> List[str]:
+        """
+        Split text into fixed-size, overlapping chunks.
+
+        For str input chunk_size and chunk_overlap count characters. For UTF-8
+        buffers (bytes, mmap, or a MappedTextFile from TextFileLoader(use_mmap=True))
+        they count bytes, so the same non-ASCII text gives shorter chunks.
+        """
+        if not isinstance(text, str):
+            return list(self.iter_split(text))
+        chunk_size = self.chunk_size
+        step = chunk_size - self.chunk_overlap
+        return [text[i : i + chunk_size] for i in range(0, len(text), step)]
 
     def split_texts(self, texts: List[str]) -> List[str]:
         chunks = []
@@ -220,18 +309,20 @@ class RecursiveTextSplitter:
                     chunks.append(chunk_text)
 
                     # Start new chunk with overlap
-                    # Keep removing items from the start until we're under overlap size
+                    # Keep items from the end until we'd exceed overlap size
                     overlap_length = 0
                     overlap_chunks = []
                     for item in reversed(current_chunk):
-                        overlap_length += len(item) + len(separator)
-                        if overlap_length > self.chunk_overlap:
+                        item_length = len(item) + len(separator)
+                        if overlap_length + item_length > self.chunk_overlap:
                             break
-                        overlap_chunks.insert(0, item)
+                        overlap_length += item_length
+                        overlap_chunks.append(item)
+                    overlap_chunks.reverse()
 
                     current_chunk = overlap_chunks
-                    current_length = sum(len(c) for c in current_chunk) + \
-                                   len(separator) * max(0, len(current_chunk) - 1)
+                    # Items plus the separators between them
+                    current_length = max(0, overlap_length - len(separator))
 
             # Add current split
             current_chunk.append(split)
@@ -250,40 +341,37 @@ class RecursiveTextSplitter:
         Tries each separator in order, using the first one that produces
         reasonable chunks.
         """
-        # Try each separator
-        for i, separator in enumerate(self.separators):
-            # Split by current separator
-            splits = self._split_text_with_separator(text, separator)
-
-            # Check if any split is too large
-            max_split_len = max(len(s) for s in splits) if splits else 0
-
-            # If all splits are small enough, merge them
-            if max_split_len <= self.chunk_size:
-                return self._merge_splits(splits, separator)
-
-            # If we've tried all separators except the last (character-level)
-            if i == len(self.separators) - 1:
-                # Force character-level splitting
-                return self._merge_splits(splits, separator)
-
-            # Otherwise, try recursively splitting the large chunks
-            good_splits = []
-            for split in splits:
-                if len(split) <= self.chunk_size:
-                    good_splits.append(split)
-                else:
-                    # Recursively split this chunk with remaining separators
-                    subsplitter = RecursiveTextSplitter(
-                        chunk_size=self.chunk_size,
-                        chunk_overlap=self.chunk_overlap,
-                        separators=self.separators[i+1:]
-                    )
-                    good_splits.extend(subsplitter.split(split))
-
-            return self._merge_splits(good_splits, separator)
-
-        return [text]
+        return self._split(text, self.separators)
+
+    def _split(self, text: str, separators: List[str]) -> List[str]:
+        """
+        Split text with the first separator, recursing into oversized pieces
+        with the remaining separators.
+
+        Only pieces that are still too large are re-scanned, so each part of
+        the text is split once per separator level it actually needs.
+        """
+        if not separators:
+            return [text]
+
+        separator = separators[0]
+        splits = self._split_text_with_separator(text, separator)
+
+        # If all splits are small enough, or this is the last separator
+        # (character-level), merge them as they are
+        max_split_len = max(len(s) for s in splits) if splits else 0
+        if max_split_len <= self.chunk_size or len(separators) == 1:
+            return self._merge_splits(splits, separator)
+
+        # Otherwise, recursively split the large pieces with remaining separators
+        good_splits = []
+        for split in splits:
+            if len(split) <= self.chunk_size:
+                good_splits.append(split)
+            else:
+                good_splits.extend(self._split(split, separators[1:]))
+
+        return self._merge_splits(good_splits, separator)
 
     def split_texts(self, texts: List[str]) -> List[str]:
         """Split multiple texts into chunks."""
@@ -1,28 +1,303 @@
 import numpy as np
-from collections import defaultdict
 from typing import List, Tuple, Callable, Dict, Optional
 from aimakerspace.openai_utils.embedding import EmbeddingModel
 import asyncio
+import hashlib
+import inspect
+import warnings
+import weakref
+
+try:
+    import simsimd
+except ImportError:  # Optional: SIMD distance kernels, NumPy is used otherwise
+    simsimd = None
+
+
+# Embeddings already computed in this session by databases built with
+# cache_embeddings=True, per embedding model and keyed by a digest of the text,
+# so rebuilding or building another database reuses them.
+_embedding_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def clear_embedding_cache() -> None:
+    """Drop every embedding kept by VectorDatabase(cache_embeddings=True)."""
+    _embedding_cache.clear()
+
+
+def _import_faiss():
+    """Import faiss on first use: it's optional and slow to import."""
+    try:
+        import faiss
+    except ImportError:
+        raise ImportError("index='faiss_flat'/'hnsw' requires faiss (pip install faiss-cpu)") from None
+    return faiss
+
+
+# Rows upcast at a time when NumPy scans float16/int8 storage
+_NUMPY_BLOCK_ROWS = 4096
 
 
 def cosine_similarity(vector_a: np.array, vector_b: np.array) -> float:
     """Computes the cosine similarity between two vectors."""
-    dot_product = np.dot(vector_a, vector_b)
-    norm_a = np.linalg.norm(vector_a)
-    norm_b = np.linalg.norm(vector_b)
-    return dot_product / (norm_a * norm_b)
+    if simsimd is not None:
+        return 1.0 - simsimd.cosine(
+            np.asarray(vector_a, dtype=np.float32), np.asarray(vector_b, dtype=np.float32)
+        )
+    return np.dot(vector_a, vector_b) / np.sqrt(
+        np.vdot(vector_a, vector_a) * np.vdot(vector_b, vector_b)
+    )
+
+
+def aligned_empty(shape: Tuple[int, int], dtype: np.dtype, alignment: int = 64) -> np.ndarray:
+    """np.empty whose data pointer is aligned to `alignment` bytes (a full AVX-512 register)."""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+def quantize_int8(vectors: np.array) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetrically quantizes vectors (along the last axis) to int8, returning them with their scales."""
+    scales = np.max(np.abs(vectors), axis=-1, keepdims=True) / 127
+    scales[scales == 0] = 1.0
+    return np.round(vectors / scales).astype(np.int8), scales.squeeze(-1)
 
 
 class VectorDatabase:
-    def __init__(self, embedding_model: EmbeddingModel = None):
-        self.vectors = defaultdict(np.array)
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel = None,
+        dtype: np.dtype = np.float32,
+        embedding_dim: Optional[int] = None,
+        index: str = "flat",
+        kernel: str = "auto",
+        cache_embeddings: bool = False,
+    ):
+        # Vectors live as L2-normalized rows of one contiguous (capacity, D)
+        # matrix, so cosine search is a single matrix-vector dot product.
+        # A narrower dtype (float16, or int8 with a per-vector scale) cuts its
+        # memory 2-4x. Scans only get cheaper with SimSIMD, which reads the narrow
+        # types natively; NumPy has to upcast them block by block, which is
+        # slower than scanning float32.
+        # For large collections, index="faiss_flat" (exact, FAISS SIMD kernels) or
+        # index="hnsw" (approximate, sublinear) answer cosine queries through FAISS.
+        # With kernel="auto" the flat scan uses BLAS for float32 and SimSIMD (when
+        # installed) for float16/int8, which it reads without upcasting. It can be
+        # pinned to "numpy", "simsimd" or "numba" (JIT-compiled, parallel over rows).
+        # cache_embeddings=True keeps a float32 copy of every embedding computed
+        # with this model for the session (see clear_embedding_cache), so later
+        # builds only embed new texts.
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16, np.int8):
+            raise ValueError(f"Unsupported storage dtype: {self.dtype}")
+        if index not in ("flat", "faiss_flat", "hnsw"):
+            raise ValueError(f"Unsupported index: {index}. Use 'flat', 'faiss_flat' or 'hnsw'.")
+        if index != "flat":
+            _import_faiss()  # Fail early if it isn't installed
+        if kernel not in ("auto", "numpy", "simsimd", "numba"):
+            raise ValueError(f"Unsupported kernel: {kernel}. Use 'auto', 'numpy', 'simsimd' or 'numba'.")
+        if kernel == "simsimd" and simsimd is None:
+            raise ImportError("kernel='simsimd' requires simsimd (pip install simsimd)")
+        if kernel == "numba":
+            try:
+                # Imported here: numba is optional and slow to import
+                from aimakerspace import numba_kernels
+            except ImportError:
+                raise ImportError("kernel='numba' requires numba (pip install numba)") from None
+            self._numba_kernels = numba_kernels
+            if self.dtype == np.float16:
+                raise ValueError("kernel='numba' supports float32 and int8 storage only")
+        if kernel == "auto":
+            # Multithreaded BLAS beats SimSIMD's single-threaded cdist on float32
+            narrow = self.dtype != np.float32
+            kernel = "simsimd" if narrow and simsimd is not None else "numpy"
+        if kernel == "numpy" and self.dtype != np.float32:
+            warnings.warn(
+                f"{self.dtype} storage saves memory but NumPy scans it slower than float32; "
+                "install simsimd (or use kernel='numba' for int8) for faster search",
+                stacklevel=2,
+            )
+        self.index = index
+        self.kernel = kernel
+        self.cache_embeddings = cache_embeddings
+        self._faiss_index = None
+        self._faiss_size = 0  # Number of leading matrix rows added to _faiss_index
+        self._keys: List[str] = []
+        self._key_to_idx: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        if embedding_dim is not None:
+            # Allocate up front so mismatched vectors are rejected from the first insert
+            self._reserve(0, embedding_dim)
         self.metadata = {}  # Store metadata for each text key
         self.embedding_model = embedding_model or EmbeddingModel()
 
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_to_idx
+
+    @property
+    def vectors(self) -> Dict[str, np.ndarray]:
+        """
+        Mapping of key -> stored vector, kept for backwards compatibility.
+        Built on every access; use len(db), `key in db` or retrieve_from_key instead.
+        """
+        return {key: self._row(idx) for idx, key in enumerate(self._keys)}
+
+    def _row(self, idx: int) -> np.ndarray:
+        if self.dtype == np.int8:
+            return self._matrix[idx].astype(np.float32) * self._scales[idx]
+        return self._matrix[idx]
+
+    def _rows_float32(self, start: int, end: int) -> np.ndarray:
+        rows = self._matrix[start:end].astype(np.float32)
+        if self.dtype == np.int8:
+            rows *= self._scales[start:end, None]
+        return rows
+
+    def _reserve(self, size: int, dim: int) -> None:
+        """Grow the backing matrix geometrically so appends are amortized O(D)."""
+        if self._matrix is None:
+            capacity = max(size, 16)
+            self._matrix = aligned_empty((capacity, dim), self.dtype)
+            self._scales = np.ones(capacity, dtype=np.float32)
+            return
+        if self._matrix.shape[1] != dim:
+            raise ValueError(
+                f"Vector dimension {dim} does not match database dimension {self._matrix.shape[1]}"
+            )
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        matrix = aligned_empty((capacity, dim), self.dtype)
+        matrix[: len(self._keys)] = self._matrix[: len(self._keys)]
+        scales = np.ones(capacity, dtype=np.float32)
+        scales[: len(self._keys)] = self._scales[: len(self._keys)]
+        self._matrix, self._scales = matrix, scales
+
     def insert(self, key: str, vector: np.array, metadata: Optional[Dict] = None) -> None:
-        self.vectors[key] = vector
-        if metadata is not None:
-            self.metadata[key] = metadata
+        self.insert_many([key], [vector], None if metadata is None else [metadata])
+
+    def insert_many(
+        self,
+        keys: List[str],
+        vectors: np.array,
+        metadatas: Optional[List[Dict]] = None,
+    ) -> None:
+        """
+        Insert a batch of vectors with one conversion and one write into the matrix.
+        Vectors are stored L2-normalized; retrieve_from_key returns the unit vector.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(keys) == 0:
+            return
+        if vectors.ndim != 2 or vectors.shape[0] != len(keys):
+            raise ValueError("vectors must be a (len(keys), D) array")
+
+        self._reserve(len(self._keys) + len(keys), vectors.shape[1])
+        idxs = np.empty(len(keys), dtype=np.intp)
+        for i, key in enumerate(keys):
+            idx = self._key_to_idx.get(key)
+            if idx is None:
+                idx = len(self._keys)
+                self._key_to_idx[key] = idx
+                self._keys.append(key)
+            idxs[i] = idx
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        if self.dtype == np.int8:
+            vectors, self._scales[idxs] = quantize_int8(vectors)
+        self._matrix[idxs] = vectors
+        if idxs.min() < self._faiss_size:
+            # FAISS indexes can't update vectors in place, rebuild on next search
+            self._faiss_index = None
+            self._faiss_size = 0
+
+        if metadatas is not None:
+            self.metadata.update(zip(keys, metadatas))
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first, without sorting all N."""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        # NaN (e.g. a zero vector under a custom measure) compares false with
+        # everything, so rank it last instead of letting it swallow the threshold
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+        # Everything above the k-th best score, then the earliest-inserted of the
+        # rows with exactly that score, so equal scores keep insertion order
+        threshold = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[: k - len(above)]
+        top = np.concatenate((above, tied))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    @staticmethod
+    def _unit_query(query_vector: np.array) -> np.ndarray:
+        # Stored rows are unit vectors, so cosine reduces to a dot product
+        query = np.asarray(query_vector, dtype=np.float32)
+        return query / (np.linalg.norm(query) or 1.0)
+
+    def _flat_cosine_scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine score of a unit query against every stored row."""
+        n = len(self._keys)
+        matrix = self._matrix[:n]
+        if self.kernel == "numba":
+            scores = self._numba_kernels.matrix_dot(matrix, query)
+        elif self.kernel == "simsimd":
+            if self.dtype == np.int8:
+                query, query_scale = quantize_int8(query)
+            else:
+                query, query_scale = query.astype(self.dtype), 1.0
+            scores = np.asarray(
+                simsimd.cdist(query[None, :], matrix, metric="dot")
+            ).ravel() * query_scale
+        elif self.dtype == np.float32:
+            scores = matrix @ query
+        else:
+            # NumPy has no BLAS kernel for float16/int8 and would upcast the whole
+            # matrix per query, so upcast fixed blocks into one reused buffer
+            scores = np.empty(n, dtype=np.float32)
+            block = np.empty((min(n, _NUMPY_BLOCK_ROWS), matrix.shape[1]), dtype=np.float32)
+            for start in range(0, n, _NUMPY_BLOCK_ROWS):
+                rows = matrix[start : start + _NUMPY_BLOCK_ROWS]
+                buffer = block[: len(rows)]
+                buffer[...] = rows
+                np.dot(buffer, query, out=scores[start : start + len(rows)])
+        if self.dtype == np.int8:
+            scores = scores * self._scales[:n]
+        return scores
+
+    def _search_faiss(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (indices, scores) for a unit query, syncing new rows into the FAISS index."""
+        n = len(self._keys)
+        if self._faiss_index is None:
+            faiss = _import_faiss()
+            dim = self._matrix.shape[1]
+            if self.index == "hnsw":
+                self._faiss_index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+                self._faiss_index.hnsw.efConstruction = 200
+            else:
+                self._faiss_index = faiss.IndexFlatIP(dim)
+        if self._faiss_size < n:
+            self._faiss_index.add(self._rows_float32(self._faiss_size, n))
+            self._faiss_size = n
+
+        k = min(k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        if self.index == "hnsw":
+            self._faiss_index.hnsw.efSearch = max(64, k)
+        scores, ids = self._faiss_index.search(query[None, :], k)
+        found = ids[0] >= 0  # FAISS pads with -1 when fewer than k results are found
+        return ids[0][found], scores[0][found]
 
     def search(
         self,
@@ -31,11 +306,22 @@ class VectorDatabase:
         distance_measure: Callable = cosine_similarity,
         return_metadata: bool = False,
     ) -> List[Tuple]:
-        scores = [
-            (key, distance_measure(query_vector, vector))
-            for key, vector in self.vectors.items()
-        ]
-        results = sorted(scores, key=lambda x: x[1], reverse=True)[:k]
+        n = len(self._keys)
+        use_cosine_kernels = distance_measure is cosine_similarity and n > 0
+        if use_cosine_kernels and self.index != "flat":
+            top, top_scores = self._search_faiss(self._unit_query(query_vector), k)
+        else:
+            if use_cosine_kernels:
+                scores = self._flat_cosine_scores(self._unit_query(query_vector))
+            else:
+                scores = np.fromiter(
+                    (distance_measure(query_vector, self._row(idx)) for idx in range(n)),
+                    dtype=np.float64,
+                    count=n,
+                )
+            top = self._top_k(scores, k)
+            top_scores = scores[top]
+        results = [(self._keys[i], float(score)) for i, score in zip(top, top_scores)]
 
         if return_metadata:
             # Return (text, score, metadata) tuples
@@ -61,12 +347,49 @@ class VectorDatabase:
         return results
 
     def retrieve_from_key(self, key: str) -> np.array:
-        return self.vectors.get(key, None)
+        idx = self._key_to_idx.get(key)
+        return None if idx is None else self._row(idx)
+
+    async def _aget_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as a float32 (N, D) array. Models that accept as_numpy hand
+        back an array directly; any other model with the plain
+        async_get_embeddings(list_of_text) signature still works.
+        """
+        get_embeddings = self.embedding_model.async_get_embeddings
+        try:
+            accepts_as_numpy = "as_numpy" in inspect.signature(get_embeddings).parameters
+        except (TypeError, ValueError):  # No introspectable signature
+            accepts_as_numpy = False
+        if accepts_as_numpy:
+            embeddings = await get_embeddings(texts, as_numpy=True)
+        else:
+            embeddings = await get_embeddings(texts)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    async def _aembed_unique(self, texts: List[str]) -> np.ndarray:
+        """Embed distinct texts, only calling the model for ones it hasn't embedded yet."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        if not self.cache_embeddings:
+            return await self._aget_embeddings(texts)
+        try:
+            cache = _embedding_cache.setdefault(self.embedding_model, {})
+        except TypeError:  # Model can't be weakly referenced or hashed, skip caching
+            return await self._aget_embeddings(texts)
+        digests = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        missing = [i for i, digest in enumerate(digests) if digest not in cache]
+        if missing:
+            embeddings = await self._aget_embeddings([texts[i] for i in missing])
+            for i, embedding in zip(missing, embeddings):
+                # Copy so an entry doesn't keep its whole batch array alive
+                cache[digests[i]] = embedding.copy()
+        return np.stack([cache[digest] for digest in digests])
 
     async def abuild_from_list(self, list_of_text: List[str]) -> "VectorDatabase":
-        embeddings = await self.embedding_model.async_get_embeddings(list_of_text)
-        for text, embedding in zip(list_of_text, embeddings):
-            self.insert(text, np.array(embedding))
+        # Duplicate texts map to the same key, so each is embedded once
+        texts = list(dict.fromkeys(list_of_text))
+        self.insert_many(texts, await self._aembed_unique(texts))
         return self
 
     async def abuild_from_list_with_metadata(self, chunks_with_metadata: List[Dict]) -> "VectorDatabase":
@@ -79,11 +402,10 @@ class VectorDatabase:
         Returns:
             Self for chaining
         """
-        texts = [chunk["text"] for chunk in chunks_with_metadata]
-        embeddings = await self.embedding_model.async_get_embeddings(texts)
-
-        for chunk, embedding in zip(chunks_with_metadata, embeddings):
-            self.insert(chunk["text"], np.array(embedding), chunk["metadata"])
+        # Duplicate texts map to the same key (last metadata wins), so each is embedded once
+        metadata_by_text = {chunk["text"]: chunk["metadata"] for chunk in chunks_with_metadata}
+        texts = list(metadata_by_text)
+        self.insert_many(texts, await self._aembed_unique(texts), list(metadata_by_text.values()))
 
         return self
 